@@ -7,7 +7,9 @@ from app.config import DATABASE_URI
 engine = create_engine(DATABASE_URI)
 
 # Create a sessionmaker bound to this engine.
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False keeps attributes loaded after commit, so handlers can read
+# e.g. new_user.id without a refresh SELECT (the PK is set by the INSERT flush).
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Dependency function that yields a session.
 def get_db():
@@ -3,11 +3,13 @@
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+from starlette.exceptions import HTTPException as StarletteHTTPException
 import logging
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
 from threading import Thread
 import time
+import pandas as pd
 
 from app.state import clear_inactive_states
 from app.routes import auth, upload, db, query, join, modify, validate_sql
@@ -20,8 +22,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger("main")
 
+# Copy-on-write: DataFrames kept as both working and original copies share memory
+# until one of them is modified.
+pd.set_option("mode.copy_on_write", True)
+
 # ---------------- APP INIT ---------------- #
-app = FastAPI(title="AI Data Analysis Chatbot API")
+app = FastAPI(title="AI Data Analysis Chatbot API", default_response_class=ORJSONResponse)
 
 # ---------------- MIDDLEWARE ---------------- #
 app.add_middleware(
@@ -72,10 +78,20 @@ def health_check():
 
 
 # ---------------- GLOBAL ERROR HANDLER ---------------- #
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+    # Same {"detail": ...} body as FastAPI's default handler, encoded with orjson.
+    return ORJSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers=getattr(exc, "headers", None),
+    )
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Unhandled error on {request.url}: {str(exc)}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "status": "error",
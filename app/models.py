@@ -18,7 +18,7 @@ class User(Base):
     username = Column(String(255), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
     dynamic_db = Column(String(255), nullable=False, default="")  # Initially blank
-    mobile_number = Column(String(10))  # ✅ Added this field
+    mobile_number = Column(String(10), unique=True, index=True, nullable=True)  # ✅ Indexed for mobile login lookups
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
 
@@ -1,31 +1,38 @@
+import hashlib
+import hmac
 import logging
-import random
-import smtplib
-import ssl
+import secrets
+import string
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 import re  # ✅ Added for regex validations
-from collections import defaultdict
-from time import time
+import threading
+from collections import deque
+from time import monotonic
+
+from cachetools import TTLCache
 
 
 from fastapi import (
     APIRouter, Depends, HTTPException, status, Response, BackgroundTasks
 )
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr, Field
 from sqlalchemy.orm import Session
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, desc, or_, text
+from sqlalchemy.engine import URL
 
-from app.utils.auth_helpers import get_current_user
+from app.utils.auth_helpers import (
+    get_current_user, verify_password, get_password_hash, create_access_token
+)
+from app.utils.smtp_pool import get_smtp, release_smtp
 from app.config import (
-    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
     MYSQL_USER, MYSQL_PASSWORD, MYSQL_HOST,
-    EMAIL_FROM, EMAIL_PASSWORD, SMTP_SERVER, SMTP_PORT
+    EMAIL_FROM
 )
-from app.database import SessionLocal
+from app.database import get_db
 from app.models import User
 from app.utils.db_helpers import connect_personal_db, list_tables, load_tables_from_personal_db
 from app.state import get_user_state, clear_user_state
@@ -33,14 +40,69 @@ from app.state import get_user_state, clear_user_state
 logger = logging.getLogger("auth")
 logger.setLevel(logging.INFO)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 router = APIRouter()
 
-otp_store = {}  # Temporary in-memory OTP store
-reset_otp_store = {}  # email: { otp, timestamp }
-reset_otp_tracker = defaultdict(list)  # email: [timestamps]
+OTP_TTL_SECONDS = 300
+OTP_STORE_MAXSIZE = 100_000
+
+# Expired entries simply disappear from the cache; TTLCache itself is not thread-safe.
+otp_store = TTLCache(maxsize=OTP_STORE_MAXSIZE, ttl=OTP_TTL_SECONDS)  # email: { otp_hash, email, mobile_number, hashed_password }
+reset_otp_store = TTLCache(maxsize=OTP_STORE_MAXSIZE, ttl=OTP_TTL_SECONDS)  # email: { otp_hash }
+_otp_lock = threading.Lock()
+
 RESET_MAX_PER_HOUR = 5
+RESET_WINDOW_SECONDS = 3600
+# email: deque[timestamps]; re-inserted on every request so idle emails age out after the window
+reset_otp_tracker = TTLCache(maxsize=OTP_STORE_MAXSIZE, ttl=RESET_WINDOW_SECONDS)
+
+# Server-level engine (no default schema) used only to create per-user databases.
+# URL.create keeps passwords containing @, / or # intact.
+_ADMIN_ENGINE = create_engine(
+    URL.create(
+        drivername="mysql+mysqlconnector",
+        username=MYSQL_USER,
+        password=MYSQL_PASSWORD,
+        host=MYSQL_HOST,
+    ),
+    pool_size=2,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+)
+
+# -------- Precompiled Patterns --------
+_MOBILE_RE = re.compile(r"^[6-9]\d{9}$")
+
+_PW_UPPER = frozenset(string.ascii_uppercase)
+_PW_LOWER = frozenset(string.ascii_lowercase)
+_PW_DIGIT = frozenset(string.digits)
+_PW_SPECIAL = frozenset("@$!%*#?&")
+
+
+def _check_password_complexity(password: str) -> None:
+    """Single pass over the password; stops as soon as all four classes are seen."""
+    mask = 0
+    for c in password:
+        if c in _PW_UPPER:
+            mask |= 1
+        elif c in _PW_LOWER:
+            mask |= 2
+        elif c in _PW_DIGIT:
+            mask |= 4
+        elif c in _PW_SPECIAL:
+            mask |= 8
+        if mask == 0xF:
+            return
+    raise ValueError("Password must include uppercase, lowercase, digit, and special character.")
+
+
+def _hash_otp(otp: str) -> bytes:
+    return hashlib.sha256(otp.encode()).digest()
+
+
+def _otp_matches(record: dict, otp: str) -> bool:
+    """Constant-time comparison of a submitted OTP against a stored record."""
+    return hmac.compare_digest(record["otp_hash"], _hash_otp(otp))
 
 # -------- Pydantic Models --------
 class UserCreate(BaseModel):
@@ -54,16 +116,20 @@ class UserCreate(BaseModel):
     )
 
     def validate_password_complexity(self):
-        password = self.password
-        if (not re.search(r"[A-Z]", password) or
-            not re.search(r"[a-z]", password) or
-            not re.search(r"\d", password) or
-            not re.search(r"[@$!%*#?&]", password)):
-            raise ValueError("Password must include uppercase, lowercase, digit, and special character.")
+        _check_password_complexity(self.password)
 
 class OTPVerifyRequest(BaseModel):
+    email: EmailStr
     otp_code: str = Field(..., min_length=4, max_length=6)
 
+class ResetPasswordRequest(BaseModel):
+    email: EmailStr
+    otp: str = Field(..., min_length=4, max_length=6)
+    new_password: str = Field(..., min_length=8, max_length=64)
+
+    def validate_password_complexity(self):
+        _check_password_complexity(self.new_password)
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -72,24 +138,8 @@ class Token(BaseModel):
 
 
 # -------- Utility Functions --------
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
-def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
-    to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+# Verified against when the login user doesn't exist, so both paths cost one bcrypt check.
+_DUMMY_HASH = get_password_hash("dummy-constant-password")
 
 def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
@@ -97,6 +147,15 @@ def get_user_by_email(db: Session, email: str):
 def get_user_by_mobile(db: Session, mobile: str):
     return db.query(User).filter(User.mobile_number == mobile).first()
 
+def get_signup_conflict(db: Session, email: str, mobile: str):
+    """Single round-trip check for an existing email or mobile; email clashes are reported first."""
+    return (
+        db.query((User.email == email).label("email_match"))
+        .filter(or_(User.email == email, User.mobile_number == mobile))
+        .order_by(desc("email_match"))
+        .first()
+    )
+
 def create_dynamic_database_for_user(user_identifier: str) -> str:
     safe_db_name = (
         user_identifier.strip()
@@ -105,7 +164,7 @@ def create_dynamic_database_for_user(user_identifier: str) -> str:
         .replace(".", "_dot_")
     )
     db_name = f"{safe_db_name}_db"
-    engine = create_engine(f"mysql+mysqlconnector://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}")
+    engine = _ADMIN_ENGINE
     with engine.connect() as connection:
         connection.execute(text(f"CREATE DATABASE IF NOT EXISTS `{db_name}`;"))
     logger.info(f"Dynamic database '{db_name}' created for user '{user_identifier}'.")
@@ -123,35 +182,27 @@ def error_response(status_code: int, message: str, error_type: str = None):
 
 def send_otp_to_email(email: str, otp: str):
     try:
-        sender = EMAIL_FROM
-        password = EMAIL_PASSWORD
-        smtp_server = SMTP_SERVER
-        smtp_port = SMTP_PORT
-
         msg = MIMEText(f"Your OTP code is {otp}")
-        msg["Subject"] = "Email Verification OTP"
-        msg["From"] = sender
+        msg["Subject"] = "OTP Verification"
+        msg["From"] = EMAIL_FROM
         msg["To"] = email
 
-        context = ssl.create_default_context()
-        with smtplib.SMTP(smtp_server, int(smtp_port)) as server:
-            server.starttls(context=context)
-            server.login(sender, password)
+        server = get_smtp()
+        try:
             server.send_message(msg)
+        finally:
+            release_smtp(server)
 
         logger.info(f"[OTP] Sent OTP {otp} to email {email}")
-    except Exception as e:
+    except Exception:
+        # Runs as a background task after the response is sent; nothing to raise to.
         logger.exception("Failed to send OTP via email")
-        error_response(status.HTTP_500_INTERNAL_SERVER_ERROR, "Failed to send OTP", "EMAIL_SEND_FAILED")
 
 # -------- Signup OTP Request --------
 @router.post("/signup/request_otp")
-def request_signup_otp(user: UserCreate, db: Session = Depends(get_db)):
-    email_regex = r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)"
-    if not re.match(email_regex, user.email):
-        error_response(status.HTTP_422_UNPROCESSABLE_ENTITY, "Invalid email format.", "INVALID_EMAIL")
-    
-    if not re.fullmatch(r"^[6-9]\d{9}$", user.mobile_number):
+def request_signup_otp(user: UserCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    # user.email is an EmailStr, so pydantic has already rejected malformed addresses.
+    if not _MOBILE_RE.fullmatch(user.mobile_number):
         error_response(status.HTTP_422_UNPROCESSABLE_ENTITY, "Invalid mobile number. Must be 10 digits starting with 6-9.", "INVALID_MOBILE")
 
     try:
@@ -159,52 +210,49 @@ def request_signup_otp(user: UserCreate, db: Session = Depends(get_db)):
     except ValueError as ve:
         error_response(status.HTTP_422_UNPROCESSABLE_ENTITY, str(ve), "WEAK_PASSWORD")
 
-    if get_user_by_email(db, user.email):
-        error_response(status.HTTP_409_CONFLICT, "Email already exists.", "EMAIL_EXISTS")
-    if get_user_by_mobile(db, user.mobile_number):
+    conflict = get_signup_conflict(db, user.email, user.mobile_number)
+    if conflict is not None:
+        if conflict.email_match:
+            error_response(status.HTTP_409_CONFLICT, "Email already exists.", "EMAIL_EXISTS")
         error_response(status.HTTP_409_CONFLICT, "Mobile number already exists.", "MOBILE_EXISTS")
 
-    otp = f"{random.randint(100000, 999999)}"
-    otp_store[otp] = {
-        "email": user.email,
-        "mobile_number": user.mobile_number,
-        "password": user.password,
-        "timestamp": datetime.utcnow()
-
-    }
-    send_otp_to_email(user.email, otp)
+    otp = f"{secrets.randbelow(900000) + 100000}"
+    # Hash now so verify_signup_otp skips bcrypt and no plaintext password is kept in memory.
+    hashed_password = get_password_hash(user.password)
+    with _otp_lock:
+        otp_store[user.email] = {
+            "otp_hash": _hash_otp(otp),
+            "email": user.email,
+            "mobile_number": user.mobile_number,
+            "hashed_password": hashed_password,
+        }
+    background_tasks.add_task(send_otp_to_email, user.email, otp)
     return {"message": "OTP sent to email. Please verify to complete signup."}
 
 # -------- Signup OTP Verification --------
 @router.post("/signup/verify_otp", response_model=Token)
-def verify_signup_otp(payload: OTPVerifyRequest, db: Session = Depends(get_db)):
+async def verify_signup_otp(payload: OTPVerifyRequest, db: Session = Depends(get_db)):
     if not payload.otp_code or not payload.otp_code.strip().isdigit():
         error_response(status.HTTP_400_BAD_REQUEST, "OTP must be numeric and not empty.", "INVALID_OTP_FORMAT")
 
-    data = otp_store.get(payload.otp_code)
-    if not data:
+    with _otp_lock:
+        data = otp_store.get(payload.email)
+    if not data or not _otp_matches(data, payload.otp_code):
         error_response(status.HTTP_400_BAD_REQUEST, "Invalid or expired OTP.", "INVALID_OTP")
-    
-    otp_time = data["timestamp"]
-    if datetime.utcnow() - otp_time > timedelta(minutes=5):
-        otp_store.pop(payload.otp_code, None)
-        error_response(status.HTTP_400_BAD_REQUEST, "OTP expired. Please request a new one.", "OTP_EXPIRED")
 
     try:
-        db_name = create_dynamic_database_for_user(data["email"])
-        hashed_password = get_password_hash(data["password"])
+        db_name = await run_in_threadpool(create_dynamic_database_for_user, data["email"])
 
         new_user = User(
             email=data["email"],
             mobile_number=data["mobile_number"],
-            hashed_password=hashed_password,
+            hashed_password=data["hashed_password"],
             dynamic_db=db_name,
             username=data["email"].split("@")[0]
         )
 
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await run_in_threadpool(db.commit)
 
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
@@ -213,7 +261,8 @@ def verify_signup_otp(payload: OTPVerifyRequest, db: Session = Depends(get_db)):
         )
 
         logger.info(f"User '{new_user.email}' signed up successfully.")
-        otp_store.pop(payload.otp_code, None)
+        with _otp_lock:
+            otp_store.pop(payload.email, None)
         return {
             "access_token": access_token,
             "token_type": "bearer",
@@ -228,7 +277,7 @@ def verify_signup_otp(payload: OTPVerifyRequest, db: Session = Depends(get_db)):
 
 # -------- Login with email or mobile --------
 @router.post("/login", response_model=Token, status_code=200)
-def login(
+async def login(
     background_tasks: BackgroundTasks,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
@@ -237,22 +286,20 @@ def login(
         if not form_data.username or not form_data.password:
             error_response(status.HTTP_400_BAD_REQUEST, "Email or mobile and password required.", "MISSING_CREDENTIALS")
 
-        email_regex = r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)"
         if "@" in form_data.username:
-            if not re.match(email_regex, form_data.username):
+            # Cheap shape check only; the unique-indexed lookup below is the real test.
+            if form_data.username.count("@") != 1:
                 error_response(status.HTTP_422_UNPROCESSABLE_ENTITY, "Invalid email format.", "INVALID_EMAIL")
         else:
-            if not re.fullmatch(r"^[6-9]\d{9}$", form_data.username):
+            if not _MOBILE_RE.fullmatch(form_data.username):
                 error_response(status.HTTP_422_UNPROCESSABLE_ENTITY, "Invalid mobile number format.", "INVALID_MOBILE")
 
-        user = get_user_by_email(db, form_data.username)
-        if not user:
-            user = get_user_by_mobile(db, form_data.username)
-        if not user:
-            error_response(status.HTTP_401_UNAUTHORIZED, "Invalid credentials.", "USER_NOT_FOUND")
-
-        if not verify_password(form_data.password, user.hashed_password):
-            error_response(status.HTTP_401_UNAUTHORIZED, "Invalid credentials.", "INVALID_PASSWORD")
+        lookup = get_user_by_email if "@" in form_data.username else get_user_by_mobile
+        user = await run_in_threadpool(lookup, db, form_data.username)
+        candidate_hash = user.hashed_password if user else _DUMMY_HASH
+        password_ok = await run_in_threadpool(verify_password, form_data.password, candidate_hash)
+        if not user or not password_ok:
+            error_response(status.HTTP_401_UNAUTHORIZED, "Invalid credentials.", "INVALID_CREDENTIALS")
 
         user_state = get_user_state(user.id)
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -326,140 +373,53 @@ def logout(response: Response, current_user: User = Depends(get_current_user)):
         )
 
 
-
-class UserCreate(BaseModel):
-    email: EmailStr
-    mobile_number: str = Field(..., pattern=r"^[6-9]\d{9}$")
-    password: str = Field(..., min_length=8, max_length=64)
-
-    def validate_password_complexity(self):
-        if (not re.search(r"[A-Z]", self.password) or
-            not re.search(r"[a-z]", self.password) or
-            not re.search(r"\d", self.password) or
-            not re.search(r"[@$!%*#?&]", self.password)):
-            raise ValueError("Password must include uppercase, lowercase, digit, and special character.")
-
-class OTPVerifyRequest(BaseModel):
-    otp_code: str = Field(..., min_length=4, max_length=6)
-
-class ResetPasswordRequest(BaseModel):
-    email: EmailStr
-    otp: str = Field(..., min_length=4, max_length=6)
-    new_password: str = Field(..., min_length=8, max_length=64)
-
-    def validate_password_complexity(self):
-        if (not re.search(r"[A-Z]", self.new_password) or
-            not re.search(r"[a-z]", self.new_password) or
-            not re.search(r"\d", self.new_password) or
-            not re.search(r"[@$!%*#?&]", self.new_password)):
-            raise ValueError("Password must include uppercase, lowercase, digit, and special character.")
-
-    
-
-
-# -------- Utility Functions --------
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
-def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
-    to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-
-def get_user_by_email(db: Session, email: str):
-    return db.query(User).filter(User.email == email).first()
-
-def get_user_by_mobile(db: Session, mobile: str):
-    return db.query(User).filter(User.mobile_number == mobile).first()
-
-def create_dynamic_database_for_user(user_identifier: str) -> str:
-    safe_db_name = user_identifier.strip().lower().replace("@", "_at_").replace(".", "_dot_")
-    db_name = f"{safe_db_name}_db"
-    engine = create_engine(f"mysql+mysqlconnector://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}")
-    with engine.connect() as connection:
-        connection.execute(text(f"CREATE DATABASE IF NOT EXISTS `{db_name}`;"))
-    logger.info(f"Dynamic database '{db_name}' created for user '{user_identifier}'.")
-    return db_name
-
-def error_response(status_code: int, message: str, error_type: str = None):
-    raise HTTPException(
-        status_code=status_code,
-        detail={"error_type": error_type, "message": message, "timestamp": datetime.utcnow().isoformat()}
-    )
-
-def send_otp_to_email(email: str, otp: str):
-    try:
-        msg = MIMEText(f"Your OTP code is {otp}")
-        msg["Subject"] = "OTP Verification"
-        msg["From"] = EMAIL_FROM
-        msg["To"] = email
-
-        context = ssl.create_default_context()
-        with smtplib.SMTP(SMTP_SERVER, int(SMTP_PORT)) as server:
-            server.starttls(context=context)
-            server.login(EMAIL_FROM, EMAIL_PASSWORD)
-            server.send_message(msg)
-
-        logger.info(f"[OTP] Sent OTP {otp} to email {email}")
-    except Exception:
-        logger.exception("Failed to send OTP via email")
-        error_response(status.HTTP_500_INTERNAL_SERVER_ERROR, "Failed to send OTP", "EMAIL_SEND_FAILED")
-
 # -------- Forgot Password Flow --------
 @router.post("/forgot/request_otp")
-def request_password_reset(email: EmailStr, db: Session = Depends(get_db)):
+def request_password_reset(email: EmailStr, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     user = get_user_by_email(db, email)
     if not user:
         error_response(status.HTTP_404_NOT_FOUND, "Email not found.", "EMAIL_NOT_REGISTERED")
 
-    now = time()
-    reset_otp_tracker[email] = [ts for ts in reset_otp_tracker[email] if now - ts < 3600]
-    if len(reset_otp_tracker[email]) >= RESET_MAX_PER_HOUR:
-        error_response(status.HTTP_429_TOO_MANY_REQUESTS, "Too many OTP requests. Try again later.", "RESET_OTP_LIMIT")
-
-    otp = f"{random.randint(100000, 999999)}"
-    reset_otp_store[email] = {"otp": otp, "timestamp": datetime.utcnow()}
-    reset_otp_tracker[email].append(now)
-    send_otp_to_email(email, otp)
+    now = monotonic()  # durations only; immune to wall-clock jumps
+    with _otp_lock:
+        attempts = reset_otp_tracker.get(email)
+        if attempts is None:
+            attempts = deque(maxlen=RESET_MAX_PER_HOUR)
+        while attempts and now - attempts[0] >= RESET_WINDOW_SECONDS:
+            attempts.popleft()
+        if len(attempts) >= RESET_MAX_PER_HOUR:
+            error_response(status.HTTP_429_TOO_MANY_REQUESTS, "Too many OTP requests. Try again later.", "RESET_OTP_LIMIT")
+        attempts.append(now)
+        reset_otp_tracker[email] = attempts
+
+        otp = f"{secrets.randbelow(900000) + 100000}"
+        reset_otp_store[email] = {"otp_hash": _hash_otp(otp)}
+    background_tasks.add_task(send_otp_to_email, email, otp)
     return {"message": "OTP sent to your email."}
 
 @router.post("/forgot/verify_otp")
-def verify_reset_otp(payload: ResetPasswordRequest, db: Session = Depends(get_db)):
-    record = reset_otp_store.get(payload.email)
+async def verify_reset_otp(payload: ResetPasswordRequest, db: Session = Depends(get_db)):
+    with _otp_lock:
+        record = reset_otp_store.get(payload.email)
     if not record:
         error_response(status.HTTP_400_BAD_REQUEST, "OTP not requested or expired.", "OTP_MISSING")
 
-    if record["otp"] != payload.otp:
+    if not _otp_matches(record, payload.otp):
         error_response(status.HTTP_400_BAD_REQUEST, "Invalid OTP.", "INVALID_OTP")
 
-    if datetime.utcnow() - record["timestamp"] > timedelta(minutes=5):
-        reset_otp_store.pop(payload.email, None)
-        error_response(status.HTTP_400_BAD_REQUEST, "OTP expired.", "OTP_EXPIRED")
-
     try:
         payload.validate_password_complexity()
     except ValueError as ve:
         error_response(status.HTTP_422_UNPROCESSABLE_ENTITY, str(ve), "WEAK_PASSWORD")
 
-    user = get_user_by_email(db, payload.email)
+    user = await run_in_threadpool(get_user_by_email, db, payload.email)
     if not user:
         error_response(status.HTTP_404_NOT_FOUND, "User not found.", "USER_NOT_FOUND")
 
-    user.hashed_password = get_password_hash(payload.new_password)
-    db.commit()
-    db.refresh(user)
-    reset_otp_store.pop(payload.email, None)
+    user.hashed_password = await run_in_threadpool(get_password_hash, payload.new_password)
+    await run_in_threadpool(db.commit)
+    with _otp_lock:
+        reset_otp_store.pop(payload.email, None)
 
     logger.info(f"Password reset successful for {payload.email}")
     return {"message": "Password reset successfully."}
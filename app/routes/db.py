@@ -2,23 +2,35 @@
  
 from fastapi import APIRouter, HTTPException, Body, Depends
 from pydantic import BaseModel
-from typing import List
-from app.utils.db_helpers import connect_personal_db, list_tables, disconnect_database
+from typing import List, Optional
+from app.utils.db_helpers import (
+    connect_personal_db, list_tables, disconnect_database, invalidate_table_cache, quote_table_name,
+    read_only_engine, read_sql_streamed, MAX_PREVIEW_WORKERS,
+)
 from app.state import get_user_state
+from fastapi.concurrency import run_in_threadpool
 from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+import asyncio
 import logging
+import re
+import time
+import orjson
 import pandas as pd
-import math
 from app.models import User
 from app.utils.auth_helpers import get_current_user
 from sqlalchemy import text
 from app.config import MYSQL_USER, MYSQL_PASSWORD, MYSQL_HOST
-from sqlalchemy.exc import OperationalError, InterfaceError, ProgrammingError, DBAPIError
  
 router = APIRouter()
 logger = logging.getLogger("db")
 logger.setLevel(logging.DEBUG)
  
+PREVIEW_ROW_LIMIT = 10
+# DDL cannot bind identifiers. DROP TABLE only runs for names found by the bound existence
+# check and quotes them with the dialect preparer; this just rejects empty names and backticks.
+_TABLE_NAME_RE = re.compile(r"^[^`]+$")
+ 
  
 class DBConnectionParams(BaseModel):
     db_type: str
@@ -29,144 +41,193 @@ class DBConnectionParams(BaseModel):
     database: str
  
  
-def clean_nan(obj):
-    """Recursively replace NaN with None for JSON serializable output."""
-    if isinstance(obj, list):
-        return [clean_nan(item) for item in obj]
-    elif isinstance(obj, dict):
-        return {key: clean_nan(value) for key, value in obj.items()}
-    elif isinstance(obj, float):
-        if math.isnan(obj):
-            return None
-        else:
-            return obj
-    else:
-        return obj
+class DataJSONResponse(ORJSONResponse):
+    """
+    Returned directly so FastAPI skips its jsonable_encoder pass over preview rows.
+    orjson handles the common types (and NaN → null) natively; anything it can't
+    encode, such as Decimal columns, falls back to jsonable_encoder per value.
+    """
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content,
+            default=jsonable_encoder,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+ 
+ 
+def records_without_nan(df: pd.DataFrame) -> list:
+    """DataFrame rows as dicts with NaN/NaT replaced by None, done in one vectorized pass."""
+    mask = df.notna()
+    if mask.values.all():
+        # Nothing to replace: skip the boxed object copy of the whole frame.
+        return df.to_dict(orient="records")
+    return df.astype(object).where(mask, None).to_dict(orient="records")
+ 
+ 
+async def _fetch_tables(engine, tables: List[str], limit: Optional[int] = None) -> list:
+    """
+    Reads each table (the first `limit` rows, or all of it when limit is None) concurrently
+    on the threadpool, at most MAX_PREVIEW_WORKERS at a time, and returns
+    (table, df, error) tuples in input order.
+    """
+    gate = asyncio.Semaphore(MAX_PREVIEW_WORKERS)
+ 
+    def fetch(table):
+        query = f"SELECT * FROM {quote_table_name(engine, table)}"
+        try:
+            if limit is None:
+                logger.info(f"Executing table query: {query}")
+                return table, read_sql_streamed(query, read_only_engine(engine)), None
+            query = f"{query} LIMIT {limit};"
+            logger.info(f"Executing preview query: {query}")
+            return table, pd.read_sql_query(query, read_only_engine(engine)), None
+        except Exception as e:
+            return table, None, e
+ 
+    async def bounded_fetch(table):
+        async with gate:
+            return await run_in_threadpool(fetch, table)
+ 
+    return list(await asyncio.gather(*(bounded_fetch(t) for t in tables)))
+ 
+ 
+# Column types whose values survive the JSON_OBJECT round trip unchanged (temporal ones
+# are parsed back below). Tables with any other type, e.g. TIME, DECIMAL, BINARY, BIT or
+# FLOAT (widened to double inside JSON), are previewed with per-table queries so their
+# cells keep the driver's Python types.
+_DATETIME_TYPES = {"datetime", "timestamp"}
+_JSON_SAFE_TYPES = _DATETIME_TYPES | {
+    "date", "tinyint", "smallint", "mediumint", "int", "integer", "bigint", "double",
+    "char", "varchar", "tinytext", "text", "mediumtext", "longtext", "enum", "set",
+}
+ 
+ 
+def _fetch_previews_batched(engine, tables: List[str], limit: int) -> list:
+    """
+    MySQL only: fetches the previews of all tables whose columns are JSON-safe in one
+    UNION ALL round trip. Each row is packed with JSON_OBJECT so tables of different shapes
+    share one result set; date/datetime columns are parsed back. Returns (table, df, None)
+    tuples for the batched tables only, in input order.
+    """
+    if not tables:
+        return []
+    preparer = engine.dialect.identifier_preparer
+    with read_only_engine(engine).connect() as conn:
+        columns = {}
+        for tbl, col, data_type in conn.execute(text(
+            "SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE FROM information_schema.columns "
+            "WHERE TABLE_SCHEMA = DATABASE() ORDER BY TABLE_NAME, ORDINAL_POSITION"
+        )):
+            columns.setdefault(tbl, []).append((col, data_type.lower()))
+ 
+        batchable = [
+            table for table in tables
+            if columns.get(table) and all(data_type in _JSON_SAFE_TYPES for _, data_type in columns[table])
+        ]
+        if not batchable:
+            return []
+ 
+        params, selects = {}, []
+        for i, table in enumerate(batchable):
+            pairs = []
+            for j, (col, _) in enumerate(columns[table]):
+                params[f"c{i}_{j}"] = col
+                pairs.append(f":c{i}_{j}, {preparer.quote(col)}")
+            params[f"t{i}"] = table
+            selects.append(
+                f"(SELECT :t{i} AS tbl, JSON_OBJECT({', '.join(pairs)}) AS row_json "
+                f"FROM {quote_table_name(engine, table)} LIMIT {limit})"
+            )
+        rows = conn.execute(text(" UNION ALL ".join(selects)), params).fetchall()
+ 
+    grouped = {table: [] for table in batchable}
+    for tbl, row_json in rows:
+        grouped[tbl].append(orjson.loads(row_json))
+ 
+    results = []
+    for table in batchable:
+        df = pd.DataFrame.from_records(grouped[table], columns=[col for col, _ in columns[table]])
+        for col, data_type in columns[table]:
+            if data_type in _DATETIME_TYPES:
+                df[col] = pd.to_datetime(df[col], errors="coerce")
+            elif data_type == "date":
+                # The drivers return datetime.date for DATE columns, not timestamps.
+                df[col] = pd.to_datetime(df[col], errors="coerce").dt.date
+        results.append((table, df, None))
+    return results
+ 
+ 
+# Connection-error classification: one precompiled alternation per dialect, whose
+# named group identifies the message to show. Earliest match in the error text wins.
+_MYSQL_ERRORS = {
+    "auth": (r"access denied|authentication failed", "❌ Invalid username or password. Please verify your credentials."),
+    "unknown_db": (r"unknown database", "❌ Database not found. Please check the database name."),
+    "unreachable": (r"can't connect|connection refused", "⚠️ Unable to reach database host. Please check host and port."),
+    "timeout": (r"timeout", "⏳ Connection timed out. Please ensure the database server is reachable."),
+    "bad_host": (r"host.*not known", "⚠️ Invalid host address. Please check the hostname or IP."),
+    "ssl": (r"ssl", "🔒 SSL connection error. Please verify SSL configuration."),
+    "too_many": (r"too many connections", "🚫 Too many open connections. Try again later."),
+    "no_connect": (r"could not connect|failed to establish", "⚠️ Could not establish connection. Please check settings."),
+}
+_VERTICA_ERRORS = {
+    "tls": (r"ssl|tls", "🔒 SSL/TLS configuration mismatch. Try disabling SSL or check server TLS settings."),
+    "auth": (r"authentication failed|invalid user", "❌ Invalid Vertica username or password."),
+    "unreachable": (r"connection refused|timeout", "⚠️ Cannot reach Vertica server. Check host/port."),
+    "missing_db": (r"database.*not found", "❌ Specified Vertica database not found."),
+}
+ 
+ 
+def _compile_errors(rules: dict) -> re.Pattern:
+    return re.compile("|".join(f"(?P<{tag}>{pattern})" for tag, (pattern, _) in rules.items()), re.I | re.S)
+ 
+ 
+_ERROR_RULES = {
+    "mysql": (_compile_errors(_MYSQL_ERRORS), _MYSQL_ERRORS),
+    "vertica": (_compile_errors(_VERTICA_ERRORS), _VERTICA_ERRORS),
+}
+ 
+ 
+def _translate_db_error(exc: Exception, dialect: str) -> str:
+    """Maps a driver connection error to a user-facing message."""
+    regex, rules = _ERROR_RULES[dialect]
+    m = regex.search(str(exc))
+    if m:
+        return rules[m.lastgroup][1]
+    if dialect == "vertica":
+        return "⚠️ Could not establish Vertica connection. Please verify settings."
+    return f"Unexpected database error: {str(exc)}"
  
  
 @router.post("/connect_db")
-def connect_db(params: DBConnectionParams, current_user: User = Depends(get_current_user)):
+async def connect_db(params: DBConnectionParams, current_user: User = Depends(get_current_user)):
     """
     Connects to a personal MySQL/Vertica database and returns available tables.
     Provides user-friendly error messages for all major connection issues.
     """
-    from sqlalchemy.engine import URL  # ✅ Import added here
     logger.info(f"Attempting DB connection for user: {current_user.username}")
+    dialect = "vertica" if params.db_type.lower() == "vertica" else "mysql"
  
     try:
-        # Step 1: Handle Vertica separately (directly here for better TLS control)
-        if params.db_type.lower() == "vertica":
-            try:
-                from sqlalchemy import create_engine
-                import sqlalchemy.dialects
-                sqlalchemy.dialects.registry.register(
-                    "vertica.vertica_python", "vertica_sqlalchemy.dialect", "VerticaDialect"
-                )
- 
-                # ✅ Build Vertica URL safely (handles special characters like @, :, /, etc.)
-                connection_url = URL.create(
-                    drivername="vertica+vertica_python",
-                    username=params.user,
-                    password=params.password,
-                    host=params.host,
-                    port=params.port or 5433,
-                    database=params.database
-                )
- 
-                # ✅ Try connection with TLS disabled (server doesn't support SSL)
-                try:
-                    engine = create_engine(connection_url, connect_args={"tlsmode": "disable"})
-                    with engine.connect() as conn:
-                        version = conn.execute(text("SELECT version();")).scalar()
- 
-                    logger.info(f"✅ Vertica connected successfully: {version}")
-                    tables = list_tables(engine)
- 
-                    user_state = get_user_state(current_user.id)
-                    user_state.personal_engine = engine
- 
-                    return jsonable_encoder({
-                        "status": "connected",
-                        "db_type": "vertica",
-                        "tables": tables
-                    })
- 
-                except Exception as e:
-                    msg = str(e).lower()
-                    if "ssl" in msg or "tls" in msg:
-                        raise HTTPException(
-                            status_code=400,
-                            detail="🔒 SSL/TLS configuration mismatch. Try disabling SSL or check server TLS settings."
-                        )
-                    elif "authentication failed" in msg or "invalid user" in msg:
-                        raise HTTPException(status_code=400, detail="❌ Invalid Vertica username or password.")
-                    elif "connection refused" in msg or "timeout" in msg:
-                        raise HTTPException(status_code=400, detail="⚠️ Cannot reach Vertica server. Check host/port.")
-                    elif "database" in msg and "not found" in msg:
-                        raise HTTPException(status_code=400, detail="❌ Specified Vertica database not found.")
-                    else:
-                        logger.error(f"❌ Vertica DB connection failed: {e}")
-                        raise HTTPException(
-                            status_code=400,
-                            detail="⚠️ Could not establish Vertica connection. Please verify settings."
-                        )
-            except HTTPException:
-                raise
-            except Exception as e:
-                logger.exception("Unexpected Vertica connection error")
-                raise HTTPException(status_code=500, detail=f"Unexpected Vertica error: {str(e)}")
- 
-        # Step 2: Handle MySQL or other databases (existing logic)
+        # Step 1: Connect through the shared, pooled engine cache
         try:
-            # ✅ Use URL.create() for MySQL too (handles special characters)
-            connection_url = URL.create(
-                drivername="mysql+pymysql",
-                username=params.user,
-                password=params.password,
+            engine = await run_in_threadpool(
+                connect_personal_db,
+                db_type=dialect,
                 host=params.host,
-                port=params.port or 3306,
-                database=params.database
+                user=params.user,
+                password=params.password,
+                database=params.database,
+                port=params.port,
             )
+        except HTTPException as e:
+            if e.__cause__ is None:
+                raise
+            logger.error(f"❌ {dialect} DB connection failed: {e.__cause__}")
+            raise HTTPException(status_code=400, detail=_translate_db_error(e.__cause__, dialect))
  
-            from sqlalchemy import create_engine
-            engine = create_engine(connection_url)
- 
-        except Exception as e:
-            logger.error(f"Failed to create MySQL engine: {e}")
-            raise HTTPException(status_code=500, detail="Failed to initialize database engine.")
- 
-        # Step 3: Test connection
+        # Step 2: Fetch tables
         try:
-            with engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
-        except (OperationalError, InterfaceError, ProgrammingError, DBAPIError) as e:
-            msg = str(e).lower()
- 
-            if "access denied" in msg or "authentication failed" in msg:
-                detail = "❌ Invalid username or password. Please verify your credentials."
-            elif "unknown database" in msg:
-                detail = "❌ Database not found. Please check the database name."
-            elif "can't connect" in msg or "connection refused" in msg:
-                detail = "⚠️ Unable to reach database host. Please check host and port."
-            elif "timeout" in msg:
-                detail = "⏳ Connection timed out. Please ensure the database server is reachable."
-            elif "host" in msg and "not known" in msg:
-                detail = "⚠️ Invalid host address. Please check the hostname or IP."
-            elif "ssl" in msg:
-                detail = "🔒 SSL connection error. Please verify SSL configuration."
-            elif "too many connections" in msg:
-                detail = "🚫 Too many open connections. Try again later."
-            elif "could not connect" in msg or "failed to establish" in msg:
-                detail = "⚠️ Could not establish connection. Please check settings."
-            else:
-                detail = f"Unexpected database error: {str(e)}"
- 
-            logger.error(f"❌ DB connection failed: {e}")
-            raise HTTPException(status_code=400, detail=detail)
- 
-        # Step 4: Fetch tables
-        try:
-            tables = list_tables(engine)
+            tables = await run_in_threadpool(list_tables, engine)
         except Exception as e:
             logger.error(f"[list_tables] Failed to fetch tables: {e}")
             raise HTTPException(
@@ -174,12 +235,14 @@ def connect_db(params: DBConnectionParams, current_user: User = Depends(get_curr
                 detail="Connected successfully, but failed to retrieve table list. Please verify permissions."
             )
  
-        # Step 5: Store connection
+        # Step 3: Store connection
         user_state = get_user_state(current_user.id)
         user_state.personal_engine = engine
  
         logger.info(f"✅ Connected successfully. Tables: {tables}")
-        return jsonable_encoder({"status": "connected", "tables": tables})
+        if dialect == "vertica":
+            return DataJSONResponse({"status": "connected", "db_type": "vertica", "tables": tables})
+        return DataJSONResponse({"status": "connected", "tables": tables})
  
     except HTTPException:
         raise
@@ -192,7 +255,7 @@ def connect_db(params: DBConnectionParams, current_user: User = Depends(get_curr
 # app/routes/db.py
  
 @router.post("/load_tables")
-def load_tables(
+async def load_tables(
     table_names: List[str] = Body(...),
     current_user: User = Depends(get_current_user)
 ):
@@ -215,39 +278,39 @@ def load_tables(
  
     previews = {}
     loaded_tables = []
+    # Table names come from the request body and end up in SQL, so only accept real tables.
+    try:
+        known_tables = set(await run_in_threadpool(list_tables, engine, raise_errors=True))
+    except Exception as e:
+        logger.error(f"[list_tables] Failed to fetch tables: {e}")
+        raise HTTPException(status_code=500, detail=f"Could not read the table list: {e}")
+    # Tables are read in full because joins, stats and overviews work on the frames
+    # in user state; only the first PREVIEW_ROW_LIMIT rows go back to the client.
+    fetched = {
+        table: (df, error)
+        for table, df, error in await _fetch_tables(
+            engine, [t for t in table_names if t in known_tables]
+        )
+    }
  
     for table in table_names:
-        try:
-            # --- START OF FIX ---
-            # Build the query based on the database dialect
-            query = ""
-            if dialect == "mysql":
-                # MySQL uses backticks
-                query = f"SELECT * FROM `{table}`;"
-            elif dialect == "vertica":
-                # Vertica uses schema.table format (which list_tables already provides)
-                # It does NOT use backticks.
-                query = f"SELECT * FROM {table};"
-            else:
-                # A sensible default for other SQL databases (like PostgreSQL)
-                query = f"SELECT * FROM {table};"
-            # --- END OF FIX ---
-           
-            logger.info(f"Executing preview query: {query}")
-           
-            df = pd.read_sql_query(query, engine)
-            loaded_tables.append((table, df))
-            logger.info(f"Fetched table '{table}' with shape: {df.shape}")
- 
-            if df.empty:
-                previews[table] = "No data available (table is empty)."
-            else:
-                preview_data = df.head(10).to_dict(orient="records")
-                preview_data = clean_nan(preview_data)
-                previews[table] = preview_data if preview_data else "No preview data available."
-        except Exception as e:
-            logger.error(f"Error fetching data for table '{table}': {e}")
-            previews[table] = f"Error fetching data: {e}"
+        if table not in fetched:
+            previews[table] = "Error fetching data: table not found."
+            continue
+        df, error = fetched[table]
+        if error is not None:
+            logger.error(f"Error fetching data for table '{table}': {error}")
+            previews[table] = f"Error fetching data: {error}"
+            continue
+ 
+        loaded_tables.append((table, df))
+        logger.info(f"Fetched table '{table}' with shape: {df.shape}")
+ 
+        if df.empty:
+            previews[table] = "No data available (table is empty)."
+        else:
+            preview_data = records_without_nan(df.head(PREVIEW_ROW_LIMIT))
+            previews[table] = preview_data if preview_data else "No preview data available."
  
     user_state.table_names = loaded_tables
  
@@ -258,13 +321,13 @@ def load_tables(
         "debug": "direct fetch preview"
     }
     logger.info(f"Final Response: {response}")
-    return jsonable_encoder(response)
+    return DataJSONResponse(response)
  
 @router.post("/disconnect")
 def disconnect(current_user: User = Depends(get_current_user)):
     user_state = get_user_state(current_user.id)
     disconnect_database(user_state)
-    return jsonable_encoder({"status": "disconnected"})
+    return {"status": "disconnected"}
  
  
 logger = logging.getLogger(__name__)
@@ -273,6 +336,9 @@ logger = logging.getLogger(__name__)
 @router.delete("/delete_table/{table_name}")
 def delete_table(table_name: str, current_user: User = Depends(get_current_user)):
     """Deletes a specific table from the user's personal database."""
+    if not _TABLE_NAME_RE.fullmatch(table_name):
+        raise HTTPException(status_code=400, detail="Invalid table name.")
+ 
     engine = connect_personal_db(
         db_type="mysql",
         host=MYSQL_HOST,
@@ -285,42 +351,39 @@ def delete_table(table_name: str, current_user: User = Depends(get_current_user)
         raise HTTPException(status_code=500, detail="Failed to connect to database.")
  
     try:
-        with engine.connect() as conn:
-            result = conn.execute(text(f"SHOW TABLES LIKE '{table_name}'"))
-            if result.fetchone() is None:
+        # Existence check and drop share one pooled connection and one transaction.
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text(
+                    "SELECT 1 FROM information_schema.tables "
+                    "WHERE table_schema = DATABASE() AND table_name = :t"
+                ),
+                {"t": table_name},
+            ).scalar()
+            if not exists:
                 raise HTTPException(status_code=404, detail="Table not found in database.")
-    except Exception as e:
-        logger.error(f"Error checking table existence: {e}")
-        raise HTTPException(status_code=500, detail="Error checking table existence.")
- 
-    try:
-        with engine.connect() as conn:
-            conn.execute(text(f"DROP TABLE IF EXISTS `{table_name}`"))
+            conn.execute(text(f"DROP TABLE IF EXISTS {quote_table_name(conn, table_name)}"))
             logger.info(f"Table '{table_name}' deleted successfully for user {current_user.username}.")
-        user_state = get_user_state(current_user.id)
-        user_state.table_names = [t for t in user_state.table_names if t[0] != table_name]
-        return {"status": "success", "message": f"Table '{table_name}' deleted from database."}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to delete table '{table_name}': {e}")
         raise HTTPException(status_code=500, detail="Failed to delete table.")
  
+    invalidate_table_cache(engine)
+    user_state = get_user_state(current_user.id)
+    # In place, so anything holding these lists sees the table disappear too.
+    for entries in (user_state.table_names, user_state.original_table_names):
+        entries[:] = [entry for entry in entries if entry[0] != table_name]
+    return {"status": "success", "message": f"Table '{table_name}' deleted from database."}
  
-@router.get("/load_user_tables_with_preview")
-def load_user_tables_with_preview(current_user: User = Depends(get_current_user)):
-    from app.utils.db_helpers import connect_personal_db, list_tables
-    import pandas as pd
-    from app.state import get_user_state
-    from fastapi.encoders import jsonable_encoder
-    import math
-    import time
-    from app.utils.data_processing import get_data_preview
- 
-    def clean_nan_fast(df: pd.DataFrame) -> list:
-        return df.replace({math.nan: None}).to_dict(orient="records")
  
+@router.get("/load_user_tables_with_preview")
+async def load_user_tables_with_preview(current_user: User = Depends(get_current_user)):
     start_time = time.time()
     user_state = get_user_state(current_user.id)
-    engine = connect_personal_db(
+    engine = await run_in_threadpool(
+        connect_personal_db,
         db_type="mysql",
         host=MYSQL_HOST,
         user=MYSQL_USER,
@@ -331,18 +394,28 @@ def load_user_tables_with_preview(current_user: User = Depends(get_current_user)
     if not engine:
         raise HTTPException(status_code=500, detail="Database connection failed.")
  
-    table_names = list_tables(engine)
+    table_names = await run_in_threadpool(list_tables, engine)
     loaded_tables, original_tables, previews = [], [], []
  
-    for table_name in table_names:
-        try:
-            df = pd.read_sql_query(f"SELECT * FROM `{table_name}` LIMIT 20", con=engine)
-            loaded_tables.append((table_name, df))
-            original_tables.append((table_name, df.copy()))
-            preview = clean_nan_fast(df)
-            previews.append({"table_name": table_name, "preview": preview})
-        except Exception as e:
-            logger.warning(f"Failed to load table '{table_name}': {e}")
+    try:
+        batched = await run_in_threadpool(_fetch_previews_batched, engine, table_names, 20)
+    except Exception as e:
+        logger.warning(f"Batched preview query failed, falling back to per-table queries: {e}")
+        batched = []
+    by_table = {table: (table, df, error) for table, df, error in batched}
+    remaining = [t for t in table_names if t not in by_table]
+    for table, df, error in await _fetch_tables(engine, remaining, 20):
+        by_table[table] = (table, df, error)
+    fetched = [by_table[t] for t in table_names]
+ 
+    for table_name, df, error in fetched:
+        if error is not None:
+            logger.warning(f"Failed to load table '{table_name}': {error}")
+            continue
+        loaded_tables.append((table_name, df))
+        original_tables.append((table_name, df.copy(deep=False)))  # copy-on-write: data copied only if modified
+        preview = records_without_nan(df)
+        previews.append({"table_name": table_name, "preview": preview})
  
     user_state.table_names = loaded_tables
     user_state.original_table_names = original_tables
@@ -350,5 +423,5 @@ def load_user_tables_with_preview(current_user: User = Depends(get_current_user)
  
     duration = round(time.time() - start_time, 2)
     logger.info(f"[Preview Load] Completed in {duration}s for user {current_user.username}")
-    return {"status": "success", "tables": previews, "load_time_sec": duration}
+    return DataJSONResponse({"status": "success", "tables": previews, "load_time_sec": duration})
  
\ No newline at end of file
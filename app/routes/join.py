@@ -8,6 +8,7 @@ import pandas as pd
 import uuid
 from app.models import User
 from app.utils.auth_helpers import get_current_user
+from app.utils.db_helpers import invalidate_table_cache
 
 import logging
 logger = logging.getLogger("join")
@@ -103,6 +104,7 @@ def join_tables(
         try:
             logger.info(f"Saving joined table `{joined_name}` to DB...")
             joined_df.to_sql(joined_name, engine, index=False, if_exists="replace")
+            invalidate_table_cache(engine)
             logger.info(f"Successfully saved `{joined_name}` to DB...")
         except Exception as e:
             logger.error(f"Failed to save joined table to DB: {e}")
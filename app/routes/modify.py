@@ -5,7 +5,7 @@ from pydantic import BaseModel
 from app.state import get_user_state  # ✅ Per-user state
 from app.utils.llm_helpers import translate_natural_language_to_sql, GoogleGenerativeAI
 from app.utils.sql_helpers import execute_sql_query
-from app.utils.db_helpers import refresh_tables
+from app.utils.db_helpers import refresh_tables, invalidate_table_cache
 import sqlalchemy
 from sqlalchemy import create_engine
 from app.config import GOOGLE_API_KEY, MYSQL_USER, MYSQL_PASSWORD, MYSQL_HOST, MYSQL_DATABASE, MODEL_NAME
@@ -63,6 +63,8 @@ def modify_data(
         else:  # SQLAlchemy engine
             with connection.begin() as conn:
                 conn.execute(sqlalchemy.text(sql_query))
+        # The generated SQL may create or drop tables.
+        invalidate_table_cache(connection)
 
         # Refresh tables
         refresh_tables(connection, user_state.table_names, user_state.original_table_names)
@@ -20,6 +20,7 @@ from app.utils.cleaning import validate_data, clean_data, rename_case_conflict_c
 from app.utils.llm_helpers import generate_data_issue_summary
 from app.config import GOOGLE_API_KEY, MYSQL_USER, MYSQL_PASSWORD, MYSQL_HOST, MYSQL_DATABASE, MODEL_NAME
 from app.utils.auth_helpers import get_current_user
+from app.utils.db_helpers import invalidate_table_cache
 from app.models import User
  
 from app.utils.cleaning import clean_data, rename_case_conflict_columns
@@ -358,6 +359,7 @@ async def clean_file(
 
             try:
                 cleaned_df.to_sql(table_name, user_engine, index=False, if_exists="replace")
+                invalidate_table_cache(user_engine)
             except Exception as e:
                 logger.error(f"Error saving cleaned table {table_name}: {e}")
                 raise HTTPException(status_code=500, detail=f"Error saving cleaned table {table_name}: {e}")
@@ -420,6 +422,7 @@ async def cancel_clean(
             for attempt in range(max_retries):
                 try:
                     df.to_sql(table_name, user_engine, index=False, if_exists="replace")
+                    invalidate_table_cache(user_engine)
                     break
                 except Exception as e:
                     logger.error(f"Attempt {attempt+1}: Error saving raw table {table_name}: {e}")
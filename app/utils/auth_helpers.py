@@ -1,12 +1,48 @@
+import base64
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+from time import time
+
+import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError, ExpiredSignatureError
 from app.models import User
 from app.database import SessionLocal
-from app.config import SECRET_KEY, ALGORITHM
+from app.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
+BCRYPT_ROUNDS = 12
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+
+def get_password_hash(password: str) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
+
+def _b64url(raw: bytes) -> bytes:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=")
+
+# The header never changes, so it is serialized once; get_current_user decodes these with jose.
+# create_access_token signs with HMAC-SHA256 directly, so the configured algorithm must match.
+if ALGORITHM != "HS256":
+    raise RuntimeError(f"create_access_token only supports HS256, but ALGORITHM is {ALGORITHM!r}.")
+_JWT_HEADER_B64 = _b64url(json.dumps({"alg": ALGORITHM, "typ": "JWT"}, separators=(",", ":")).encode())
+_JWT_KEY = SECRET_KEY.encode()
+
+def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
+    expire = time() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)).total_seconds()
+    payload = {**data, "exp": int(expire)}
+    signing_input = _JWT_HEADER_B64 + b"." + _b64url(json.dumps(payload, separators=(",", ":")).encode())
+    signature = _b64url(hmac.new(_JWT_KEY, signing_input, hashlib.sha256).digest())
+    return (signing_input + b"." + signature).decode()
+
+
 def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
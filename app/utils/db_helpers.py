@@ -1,31 +1,83 @@
 # app/utils/db_helpers.py
+import hashlib
 import os
+import threading
+import time
+import traceback
 import pandas as pd
 import sqlalchemy
-from sqlalchemy import text
+import sqlalchemy.dialects
+from sqlalchemy import create_engine, event, text
 from app.config import MYSQL_USER, MYSQL_PASSWORD, MYSQL_HOST, MYSQL_DATABASE
-from app.state import get_user_state
+from app.state import get_user_state, user_states
 from fastapi import Depends, HTTPException
-from typing import List, Union
-from sqlalchemy.engine import Engine
+from collections import OrderedDict
+from typing import Dict, List, Union
+from sqlalchemy.engine import Engine, URL
 import logging
  
 logger = logging.getLogger("db_helpers")
 logger.setLevel(logging.INFO)
  
+# Full-table reads go through a server-side cursor in chunks of this many rows,
+# so the driver never buffers an entire result set on top of the DataFrame.
+# mysqlconnector has no server-side cursors in SQLAlchemy; MySQL reads that should
+# stream use the pymysql read engine from read_only_engine().
+STREAM_CHUNK_ROWS = 10_000
+ 
+ 
+def read_sql_streamed(query: str, con) -> pd.DataFrame:
+    """
+    pd.read_sql_query for whole tables, streamed with yield_per when the dialect has
+    server-side cursors. Other dialects get a plain read, since chunking would only add copies.
+    """
+    if not getattr(con.dialect, "supports_server_side_cursors", False):
+        return pd.read_sql_query(text(query), con)
+    statement = text(query).execution_options(yield_per=STREAM_CHUNK_ROWS)
+    chunks = pd.read_sql_query(statement, con, chunksize=STREAM_CHUNK_ROWS)
+    return pd.concat(chunks, ignore_index=True)
+ 
+ 
+def quote_table_name(connectable, table: str) -> str:
+    """
+    Quotes a table name with the dialect's own IdentifierPreparer (engine or connection).
+    Vertica names come from list_tables as schema.table and are quoted part by part.
+    """
+    dialect = connectable.dialect
+    preparer = dialect.identifier_preparer
+    if dialect.name == "vertica" and "." in table:
+        schema, name = table.split(".", 1)
+        return f"{preparer.quote_schema(schema)}.{preparer.quote(name)}"
+    return preparer.quote(table)
+ 
  
 # ============================================================
 # 🔁 Refresh Table Data (For both MySQL / Vertica)
 # ============================================================
+def _upsert_table(table_names: list, idx_by_name: dict, tbl_name: str, df) -> None:
+    """Replaces tbl_name's entry in table_names, or appends it, keeping idx_by_name in sync."""
+    idx = idx_by_name.get(tbl_name)
+    if idx is None:
+        idx_by_name[tbl_name] = len(table_names)
+        table_names.append((tbl_name, df))
+    else:
+        table_names[idx] = (tbl_name, df)
+ 
+ 
 def refresh_tables(connection, table_names, original_table_names) -> None:
     if connection is None:
         print("Cannot refresh tables: connection is None.")
         return
  
+    # Position of each table in table_names, built once instead of scanned per table.
+    # Built back to front so a duplicated name maps to its first entry, as before.
+    idx_by_name = {name: i for i, (name, _) in reversed(list(enumerate(table_names)))}
+ 
     if hasattr(connection, "cursor"):
         # MySQL raw connection
+        # pymysql rather than mysqlconnector so read_sql_streamed gets a server-side cursor.
         engine = sqlalchemy.create_engine(
-            f"mysql+mysqlconnector://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DATABASE}"
+            f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DATABASE}"
         )
         cursor = connection.cursor(buffered=True)
         try:
@@ -37,15 +89,12 @@ def refresh_tables(connection, table_names, original_table_names) -> None:
             for tbl in db_tables:
                 tbl_name = tbl[0]
                 try:
-                    df = pd.read_sql_query(f"SELECT * FROM `{tbl_name}`", conn)
+                    df = read_sql_streamed(f"SELECT * FROM {quote_table_name(conn, tbl_name)}", conn)
                 except Exception as e:
                     print(f"Error loading table '{tbl_name}': {e}")
                     continue
-                if tbl_name not in [tn for tn, _ in table_names]:
-                    table_names.append((tbl_name, df))
-                else:
-                    idx = next(i for i, (name, _) in enumerate(table_names) if name == tbl_name)
-                    table_names[idx] = (tbl_name, df)
+                _upsert_table(table_names, idx_by_name, tbl_name, df)
+        engine.dispose()
     else:
         # SQLAlchemy connections
         dialect_name = getattr(connection.engine.dialect, "name", "")
@@ -62,26 +111,68 @@ def refresh_tables(connection, table_names, original_table_names) -> None:
             result = connection.execute(query)
             db_tables = [(row[0],) for row in result.fetchall()]
  
+        # Engines from connect_personal_db read through their streaming read engine.
+        reader = read_only_engine(connection) if isinstance(connection, Engine) else connection
         for tbl in db_tables:
             tbl_name = tbl[0]
             try:
-                df = pd.read_sql_query(f"SELECT * FROM `{tbl_name}`", connection)
+                df = read_sql_streamed(f"SELECT * FROM {quote_table_name(connection, tbl_name)}", reader)
             except Exception as e:
                 print(f"Error loading table '{tbl_name}': {e}")
                 continue
-            if tbl_name not in [tn for tn, _ in table_names]:
-                table_names.append((tbl_name, df))
-            else:
-                idx = next(i for i, (name, _) in enumerate(table_names) if name == tbl_name)
-                table_names[idx] = (tbl_name, df)
+            _upsert_table(table_names, idx_by_name, tbl_name, df)
  
  
 # ============================================================
 # 📋 List Tables (MySQL / Vertica)
 # ============================================================
-def list_tables(connection: Union[Engine, any]) -> List[str]:
+# Table metadata rarely changes within a session, so list_tables results are kept
+# briefly per engine. Writers call invalidate_table_cache() after creating/dropping tables.
+TABLE_CACHE_TTL_SECONDS = 60
+_TABLE_CACHE: Dict[int, tuple] = {}  # id(engine): (expires_at, engine, tables)
+ 
+ 
+def _cached_tables(engine) -> Union[List[str], None]:
+    entry = _TABLE_CACHE.get(id(engine))
+    # The engine is kept in the entry so its id() cannot be reused by another object.
+    if entry and entry[1] is engine and entry[0] > time.monotonic():
+        return list(entry[2])
+    return None
+ 
+ 
+def _store_tables(engine, tables: List[str]) -> List[str]:
+    now = time.monotonic()
+    # Prune expired entries so engines that are no longer used are not kept alive here.
+    for key, (expires_at, _, _) in list(_TABLE_CACHE.items()):
+        if expires_at <= now:
+            _TABLE_CACHE.pop(key, None)
+    _TABLE_CACHE[id(engine)] = (now + TABLE_CACHE_TTL_SECONDS, engine, list(tables))
+    return tables
+
+
+def _drop_cached_tables(engine) -> None:
+    entry = _TABLE_CACHE.get(id(engine))
+    if entry and entry[1] is engine:
+        _TABLE_CACHE.pop(id(engine), None)
+ 
+ 
+def invalidate_table_cache(engine) -> None:
+    """Forgets cached table lists for every engine pointing at the same host and database."""
+    url = getattr(engine, "url", None)
+    database = engine_database(engine) if url is not None else None
+    for key, (_, cached_engine, _) in list(_TABLE_CACHE.items()):
+        if cached_engine is engine or (
+            url is not None
+            and cached_engine.url.host == url.host
+            and engine_database(cached_engine) == database
+        ):
+            _TABLE_CACHE.pop(key, None)
+ 
+ 
+def list_tables(connection: Union[Engine, any], raise_errors: bool = False) -> List[str]:
     """
     Returns a list of tables for MySQL or Vertica connections.
+    With raise_errors=True, metadata query failures are raised instead of returning [].
     """
     try:
         # ✅ Case 1: MySQL raw connector
@@ -102,47 +193,43 @@ def list_tables(connection: Union[Engine, any]) -> List[str]:
  
         # ✅ Case 2: SQLAlchemy engine
         elif hasattr(connection, "connect"):
-            with connection.connect() as conn:
+            cached = _cached_tables(connection)
+            if cached is not None:
+                return cached
+ 
+            with read_only_engine(connection).connect() as conn:
                 dialect = conn.engine.dialect.name.lower()
                 logger.info(f"[SQLAlchemy] Detected dialect: {dialect}")
  
                 if dialect == "mysql":
-                    db_name = connection.url.database
+                    db_name = engine_database(connection)
                     query = text(
                         "SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = :schema"
                     )
                     result = conn.execute(query, {"schema": db_name})
                     tables = [row[0] for row in result.fetchall()]
                     logger.info(f"[MySQL] Tables found: {tables}")
-                    return tables
+                    return _store_tables(connection, tables)
  
                 elif dialect == "vertica":
-                    logger.info("[Vertica] Fetching non-system schemas...")
+                    logger.info("[Vertica] Fetching tables from non-system schemas...")
                     try:
-                        schema_query = text("""
-                            SELECT schema_name
-                            FROM v_catalog.schemata
-                            WHERE is_system_schema = false
-                        """)
-                        schemas = [row[0] for row in conn.execute(schema_query).fetchall()]
+                        # One catalog query instead of one per schema.
+                        result = conn.execute(text("""
+                            SELECT t.table_schema || '.' || t.table_name
+                            FROM v_catalog.tables t
+                            JOIN v_catalog.schemata s ON s.schema_name = t.table_schema
+                            WHERE s.is_system_schema = false
+                              AND t.is_system_table = false
+                        """))
+                        tables = [row[0] for row in result.fetchall()]
                     except Exception as e:
-                        logger.error(f"[Vertica] Failed to fetch schemas: {e}")
+                        logger.error(f"[Vertica] Failed to fetch tables: {e}")
+                        if raise_errors:
+                            raise
                         return []
- 
-                    tables = []
-                    for schema in schemas:
-                        try:
-                            result = conn.execute(text("""
-                                SELECT table_name
-                                FROM v_catalog.tables
-                                WHERE table_schema = :schema AND is_system_table = false
-                            """), {"schema": schema})
-                            rows = result.fetchall()
-                            tables.extend([f"{schema}.{row[0]}" for row in rows])
-                        except Exception as e:
-                            logger.warning(f"[Vertica] Failed to query schema '{schema}': {e}")
                     logger.info(f"[Vertica] Tables found: {tables}")
-                    return tables
+                    return _store_tables(connection, tables)
  
                 else:
                     logger.warning(f"Unsupported DB dialect: {dialect}")
@@ -154,54 +241,230 @@ def list_tables(connection: Union[Engine, any]) -> List[str]:
  
     except Exception as e:
         logger.error(f"[list_tables] Error listing tables: {e}", exc_info=True)
+        if raise_errors:
+            raise
         return []
  
  
 # ============================================================
 # 🔌 Main Connection Function (MySQL / Vertica)
 # ============================================================
-import logging
-from fastapi import HTTPException
- 
-logger = logging.getLogger(__name__)
- 
+# Engines are shared across requests so each call reuses pooled connections
+# instead of paying a fresh TCP + auth handshake. MySQL engines are keyed per server
+# and credentials, not per database: every user's dynamic_db on MYSQL_HOST shares one
+# pool, and each database gets a lightweight view (see _database_view). The cache is an
+# LRU of at most MAX_CACHED_ENGINES engines; engines a session still holds are never
+# evicted, and evicted engines are disposed so their connections close.
+MAX_CACHED_ENGINES = 16
+# Preview fan-out width; the read pools are sized to it.
+MAX_PREVIEW_WORKERS = 8
+_ENGINE_CACHE: "OrderedDict[tuple, Engine]" = OrderedDict()
+_ENGINE_LOCK = threading.Lock()
+_POOL_OPTIONS = dict(pool_size=10, max_overflow=10, pool_timeout=30, pool_pre_ping=True, pool_recycle=3600)
+ 
+# MySQL read paths (previews, table lists, full-table loads) use an autocommit sibling of
+# each cached engine. Autocommit is set once per new connection, so plain SELECTs never
+# open a transaction and the pool skips its rollback on return. Writers keep the
+# transactional engine. The read pool only has to cover a preview fan-out, and it is
+# disposed together with its engine (see _dispose_engine).
+_READ_ENGINES: Dict[int, tuple] = {}  # id(engine or view): (engine or view, read_engine)
+_READ_POOL_OPTIONS = dict(_POOL_OPTIONS, pool_size=MAX_PREVIEW_WORKERS, max_overflow=MAX_PREVIEW_WORKERS)
+ 
+# Per-database views of the shared MySQL engines.
+_DATABASE_OPTION = "mysql_database"
+_DB_VIEWS: Dict[tuple, Engine] = {}  # (server key, database): view
+_VIEW_BASE: Dict[int, tuple] = {}  # id(view): (view, base engine)
+ 
+_connect_logger = logging.getLogger("connect_personal_db")
+_connect_logger.setLevel(logging.INFO)
+ 
+ 
+def engine_cache_key(db_type, host, user, password, database, port=3306) -> tuple:
+    # The password is part of the key (hashed) so a cached engine is only handed out for the same credentials.
+    # MySQL engines serve every database on the server, so the database is not part of their key.
+    password_digest = hashlib.sha256(str(password).encode()).hexdigest()
+    db_type_l = str(db_type).lower()
+    db_part = None if db_type_l == "mysql" else str(database)
+    return (db_type_l, str(host), int(port) if port else None, str(user), password_digest, db_part)
+ 
+ 
+def engine_database(engine) -> Union[str, None]:
+    """Database an engine's connections use: its per-database view option, else the URL's."""
+    options = engine.get_execution_options() if hasattr(engine, "get_execution_options") else {}
+    return options.get(_DATABASE_OPTION) or engine.url.database
+ 
+ 
+def _select_database_on_connect(engine: Engine) -> None:
+    """
+    Points each connection checked out through a per-database view at that view's
+    database. The pooled DBAPI connection remembers its current database, so the
+    switch (COM_INIT_DB, no transaction) only happens when it differs.
+    """
+    @event.listens_for(engine, "engine_connect")
+    def use_database(conn):
+        database = conn.get_execution_options().get(_DATABASE_OPTION)
+        if database is None:
+            return
+        info = conn.connection.info
+        if info.get(_DATABASE_OPTION) != database:
+            dbapi_conn = conn.connection.dbapi_connection
+            if hasattr(dbapi_conn, "select_db"):
+                dbapi_conn.select_db(database)  # pymysql
+            else:
+                dbapi_conn.database = database  # mysqlconnector
+            info[_DATABASE_OPTION] = database
+ 
+ 
+def _base_of(engine):
+    entry = _VIEW_BASE.get(id(engine))
+    if entry and entry[0] is engine:
+        return entry[1]
+    return engine
+ 
+ 
+def _in_use(base: Engine) -> bool:
+    """True while any user session holds this engine, or a view of it, as its personal engine."""
+    return any(
+        _base_of(getattr(state, "personal_engine", None)) is base for state in list(user_states.values())
+    )
+ 
+ 
+def _dispose_engine(engine: Engine) -> None:
+    for view_key, view in list(_DB_VIEWS.items()):
+        if _base_of(view) is engine:
+            _DB_VIEWS.pop(view_key, None)
+            _VIEW_BASE.pop(id(view), None)
+            _READ_ENGINES.pop(id(view), None)
+            _drop_cached_tables(view)
+    _drop_cached_tables(engine)
+    entry = _READ_ENGINES.pop(id(engine), None)
+    if entry and entry[0] is engine:
+        entry[1].dispose()
+    engine.dispose()
+ 
+ 
+def evict_engine(key: tuple) -> None:
+    """Drops a cached engine and closes its pooled connections."""
+    with _ENGINE_LOCK:
+        engine = _ENGINE_CACHE.pop(key, None)
+    if engine is not None:
+        _dispose_engine(engine)
+ 
+ 
+def release_engine(engine: Engine) -> None:
+    """Evicts a cached engine once no user session holds it (or a view of it) as its personal engine."""
+    base = _base_of(engine)
+    if _in_use(base):
+        return
+    with _ENGINE_LOCK:
+        key = next((k for k, cached in _ENGINE_CACHE.items() if cached is base), None)
+    if key is not None:
+        evict_engine(key)
+ 
+ 
+def read_only_engine(engine: Engine) -> Engine:
+    """Autocommit sibling of a cached MySQL engine or view; any other engine is returned as is."""
+    entry = _READ_ENGINES.get(id(engine))
+    if entry and entry[0] is engine:
+        return entry[1]
+    return engine
+ 
+ 
+def _cache_engine(key: tuple, engine: Engine, read_engine: Engine = None) -> Engine:
+    evicted = []
+    with _ENGINE_LOCK:
+        cached = _ENGINE_CACHE.setdefault(key, engine)
+        _ENGINE_CACHE.move_to_end(key)
+        if cached is engine and read_engine is not None:
+            _READ_ENGINES[id(engine)] = (engine, read_engine)
+        # Oldest first, skipping engines a session still uses; if all are in use the cache grows.
+        for old_key, old in list(_ENGINE_CACHE.items()):
+            if len(_ENGINE_CACHE) - len(evicted) <= MAX_CACHED_ENGINES:
+                break
+            if old is not cached and not _in_use(old):
+                _ENGINE_CACHE.pop(old_key)
+                evicted.append(old)
+    for old in evicted:
+        _dispose_engine(old)
+    if cached is not engine:
+        # Another request created the same engine concurrently; keep the first one.
+        engine.dispose()
+        if read_engine is not None:
+            read_engine.dispose()
+    return cached
+ 
+ 
+def _database_view(key: tuple, base: Engine, database: str) -> Engine:
+    """Cached per-database view of a shared MySQL engine, plus the matching read view."""
+    with _ENGINE_LOCK:
+        view = _DB_VIEWS.get((key, database))
+        if view is not None and _base_of(view) is base:
+            return view
+        view = base.execution_options(**{_DATABASE_OPTION: database})
+        _DB_VIEWS[(key, database)] = view
+        _VIEW_BASE[id(view)] = (view, base)
+        read_entry = _READ_ENGINES.get(id(base))
+        if read_entry and read_entry[0] is base:
+            _READ_ENGINES[id(view)] = (view, read_entry[1].execution_options(**{_DATABASE_OPTION: database}))
+        return view
  
-from sqlalchemy.engine import URL
  
 def connect_personal_db(db_type, host, user, password, database, port=3306):
     """
     Create and validate a connection to either MySQL or Vertica.
     Uses sqlalchemy.engine.URL.create to avoid URL-encoding issues with special chars.
+    Validated engines are cached per connection parameters and reused on later calls.
     """
-    from sqlalchemy import create_engine, text
-    import traceback
-    import logging
-    from fastapi import HTTPException
- 
-    logger = logging.getLogger("connect_personal_db")
-    logger.setLevel(logging.INFO)
- 
     try:
         db_type_l = str(db_type).lower()
+        key = engine_cache_key(db_type, host, user, password, database, port)
+        with _ENGINE_LOCK:
+            cached = _ENGINE_CACHE.get(key)
+            if cached is not None:
+                _ENGINE_CACHE.move_to_end(key)
+                if db_type_l == "mysql":
+                    view = _DB_VIEWS.get((key, str(database)))
+                    if view is not None and _base_of(view) is cached:
+                        return view
+        if cached is not None and db_type_l != "mysql":
+            return cached
  
         # -----------------------------
         # MySQL
         # -----------------------------
         if db_type_l == "mysql":
-            # Build a proper URL object (avoids manual percent-encoding)
-            url = URL.create(
-                drivername="mysql+mysqlconnector",
-                username=str(user),
-                password=str(password),
-                host=str(host),
-                port=int(port) if port else 3306,
-                database=str(database),
-            )
-            engine = create_engine(url, pool_pre_ping=True)
-            with engine.connect() as conn:
-                conn.execute(text("SELECT 1;"))
-            logger.info(f"✅ MySQL connection OK for DB: {database}")
-            return engine
+            if cached is None:
+                # Build a proper URL object (avoids manual percent-encoding). No database:
+                # the engine serves the whole server and views select the database.
+                url = URL.create(
+                    drivername="mysql+mysqlconnector",
+                    username=str(user),
+                    password=str(password),
+                    host=str(host),
+                    port=int(port) if port else 3306,
+                )
+                engine = create_engine(url, **_POOL_OPTIONS)
+                _select_database_on_connect(engine)
+                # The read engine uses pymysql, whose SSCursor lets read_sql_streamed stream.
+                read_engine = create_engine(
+                    url.set(drivername="mysql+pymysql"),
+                    isolation_level="AUTOCOMMIT", pool_reset_on_return=None, **_READ_POOL_OPTIONS,
+                )
+                _select_database_on_connect(read_engine)
+                try:
+                    # Validates credentials and the database before anything is cached.
+                    with engine.execution_options(**{_DATABASE_OPTION: str(database)}).connect() as conn:
+                        conn.execute(text("SELECT 1;"))
+                except Exception:
+                    engine.dispose()
+                    read_engine.dispose()
+                    raise
+                cached = _cache_engine(key, engine, read_engine)
+            else:
+                with cached.execution_options(**{_DATABASE_OPTION: str(database)}).connect() as conn:
+                    conn.execute(text("SELECT 1;"))
+            _connect_logger.info(f"✅ MySQL connection OK for DB: {database}")
+            return _database_view(key, cached, str(database))
  
         # -----------------------------
         # Vertica
@@ -210,13 +473,12 @@ def connect_personal_db(db_type, host, user, password, database, port=3306):
             # Registering vertica dialect might be needed in some environments;
             # if you already have vertica_sqlalchemy installed this is optional.
             try:
-                import sqlalchemy.dialects
                 sqlalchemy.dialects.registry.register(
                     "vertica.vertica_python", "vertica_sqlalchemy.dialect", "VerticaDialect"
                 )
             except Exception:
                 # Not fatal — registration may already exist
-                logger.debug("Vertica dialect registration skipped/failed (might already exist).")
+                _connect_logger.debug("Vertica dialect registration skipped/failed (might already exist).")
  
             url = URL.create(
                 drivername="vertica+vertica_python",
@@ -228,18 +490,18 @@ def connect_personal_db(db_type, host, user, password, database, port=3306):
             )
  
             # use connect_args to control tlsmode if your Vertica server needs it
-            engine = create_engine(url, connect_args={"tlsmode": "disable"})
+            engine = create_engine(url, connect_args={"tlsmode": "disable"}, **_POOL_OPTIONS)
             try:
                 with engine.connect() as conn:
                     conn.execute(text("SELECT version();"))
-                logger.info(f"✅ Vertica connection OK for DB: {database}")
-                return engine
+                _connect_logger.info(f"✅ Vertica connection OK for DB: {database}")
+                return _cache_engine(key, engine)
             except Exception as e:
-                logger.error(f"❌ Vertica DB connection failed: {e}\n{traceback.format_exc()}")
+                _connect_logger.error(f"❌ Vertica DB connection failed: {e}\n{traceback.format_exc()}")
                 raise HTTPException(
                     status_code=400,
                     detail="⚠️ Could not establish Vertica connection. Please verify host, port, username, password, and database name."
-                )
+                ) from e
  
         # -----------------------------
         # Unsupported
@@ -247,12 +509,15 @@ def connect_personal_db(db_type, host, user, password, database, port=3306):
         else:
             raise HTTPException(status_code=400, detail=f"Unsupported DB type: {db_type}")
  
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"❌ General DB connection error: {e}\n{traceback.format_exc()}")
+        _connect_logger.error(f"❌ General DB connection error: {e}\n{traceback.format_exc()}")
+        # The driver error is kept as __cause__ so callers can report something more specific.
         raise HTTPException(
             status_code=400,
             detail=f"⚠️ Could not establish {db_type.upper()} connection. Please verify host, port, username, password, and database name."
-        )
+        ) from e
  
  
 # ============================================================
@@ -261,12 +526,11 @@ def connect_personal_db(db_type, host, user, password, database, port=3306):
 def load_tables_from_personal_db(engine, table_list: list) -> tuple:
     loaded_tables = []
     original_tables = []
-    dialect = engine.url.get_dialect().name.lower() if engine.url.get_dialect() else ""
     for tbl in table_list:
         try:
-            query = f"SELECT * FROM {tbl}" if dialect == "vertica" else f"SELECT * FROM `{tbl}`"
-            df = pd.read_sql_query(query, con=engine)
-            df.columns = [col.strip().replace(" ", "_").lower() for col in df.columns]
+            query = f"SELECT * FROM {quote_table_name(engine, tbl)}"
+            df = read_sql_streamed(query, read_only_engine(engine))
+            df.columns = df.columns.str.strip().str.replace(" ", "_", regex=False).str.lower()
             original_df = df.copy()
             from app.utils.cleaning import clean_data
             df = clean_data(df)
@@ -281,13 +545,13 @@ def load_tables_from_personal_db(engine, table_list: list) -> tuple:
 # ❌ Disconnect Database
 # ============================================================
 def disconnect_database(user_state):
-    if getattr(user_state, "personal_engine", None):
-        try:
-            user_state.personal_engine.dispose()
-            print("Personal database disconnected.")
-        except Exception as e:
-            print(f"Error disconnecting personal database: {e}")
+    engine = getattr(user_state, "personal_engine", None)
+    if engine:
+        # The engine may be shared through the engine cache; its pool is only
+        # closed once no other session holds it.
         user_state.personal_engine = None
+        release_engine(engine)
+        print("Personal database disconnected.")
  
     if getattr(user_state, "mysql_connection", None):
         try:
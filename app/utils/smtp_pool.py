@@ -0,0 +1,70 @@
+# app/utils/smtp_pool.py
+
+import atexit
+import logging
+import queue
+import smtplib
+import ssl
+
+from app.config import EMAIL_FROM, EMAIL_PASSWORD, SMTP_SERVER, SMTP_PORT
+
+logger = logging.getLogger("smtp_pool")
+logger.setLevel(logging.INFO)
+
+SMTP_POOL_SIZE = 4
+
+_pool = queue.Queue(maxsize=SMTP_POOL_SIZE)  # ✅ Idle, already-authenticated connections
+_SSL_CTX = ssl.create_default_context()  # ✅ Parse the CA bundle once, not per connection
+
+
+def _open_smtp() -> smtplib.SMTP:
+    server = smtplib.SMTP(SMTP_SERVER, int(SMTP_PORT))
+    try:
+        server.starttls(context=_SSL_CTX)
+        server.login(EMAIL_FROM, EMAIL_PASSWORD)
+    except Exception:
+        _close_smtp(server)
+        raise
+    return server
+
+
+def _close_smtp(server: smtplib.SMTP) -> None:
+    try:
+        server.quit()
+    except Exception:
+        server.close()
+
+
+def get_smtp() -> smtplib.SMTP:
+    """Returns a live pooled connection, opening a new one when none is idle."""
+    while True:
+        try:
+            server = _pool.get_nowait()
+        except queue.Empty:
+            return _open_smtp()
+
+        # Idle connections may have been dropped by the server; NOOP before reuse.
+        try:
+            if server.noop()[0] == 250:
+                return server
+        except OSError:  # SMTPException is an OSError subclass
+            pass
+        _close_smtp(server)
+
+
+def release_smtp(server: smtplib.SMTP) -> None:
+    """Returns a connection to the pool, closing it if the pool is already full."""
+    try:
+        _pool.put_nowait(server)
+    except queue.Full:
+        _close_smtp(server)
+
+
+@atexit.register
+def close_all_smtp() -> None:
+    while True:
+        try:
+            server = _pool.get_nowait()
+        except queue.Empty:
+            return
+        _close_smtp(server)
@@ -3,6 +3,7 @@ import re
 import pandas as pd
 import sqlalchemy
 from sqlalchemy import text
+from app.utils.db_helpers import invalidate_table_cache
  
 def clean_sql_query(raw_query: str, dialect: str = None) -> str:
     cleaned_query = raw_query.strip()
@@ -117,6 +118,7 @@ def execute_sql_query(sql_query: str, user_query: str, connection) -> pd.DataFra
                     result = pd.read_sql_query(sql_query, conn)
                 else:
                     conn.execute(text(sql_query))
+                    invalidate_table_cache(connection)
                     result = pd.DataFrame()
         elif hasattr(connection, "cursor"):
             cursor = connection.cursor(buffered=True)
@@ -128,6 +130,7 @@ def execute_sql_query(sql_query: str, user_query: str, connection) -> pd.DataFra
                     result = pd.DataFrame(rows, columns=columns)
                 else:
                     connection.commit()
+                    invalidate_table_cache(connection)
                     result = pd.DataFrame()
             finally:
                 cursor.close()
@@ -136,6 +139,7 @@ def execute_sql_query(sql_query: str, user_query: str, connection) -> pd.DataFra
                 result = pd.read_sql_query(sql_query, connection)
             else:
                 connection.execute(text(sql_query))
+                invalidate_table_cache(getattr(connection, "engine", connection))
                 result = pd.DataFrame()
         return result
     except Exception as e: